@@ -1,20 +1,26 @@
-import platform
+import sys
 import asyncio
 
-# Initial attempt to set policy at module load
-if platform.system() == "Windows":
+# Initial attempt to set policy at module load. Skipped when the selector policy is already in place
+# (e.g. set by ADK or another library), since swapping policies again can invalidate a cached loop.
+if sys.platform == "win32" and not isinstance(asyncio.get_event_loop_policy(), asyncio.WindowsSelectorEventLoopPolicy):
     try:
         # Attempt to set the policy at module load
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-        print("ADK Agent (Module Load): WindowsSelectorEventLoopPolicy set.")
     except Exception as e:
         # This might fail if a loop is already set or running, which can happen
         # depending on how ADK initializes.
         print(f"ADK Agent (Module Load): Info/Error setting event loop policy: {e}. May already be set or unchangeable.")
 
 import os
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
-from bs4 import BeautifulSoup
+import atexit
+import random
+import functools
+import httpx
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError: # selectolax is optional; parsing falls back to BeautifulSoup
+    LexborHTMLParser = None
 from google.adk.agents import Agent
 from google.generativeai import types as genai_types
 
@@ -23,47 +29,319 @@ load_dotenv() # Load environment variables from .env file
 
 from .google_sheets_utils import save_jobs_to_google_sheet
 
-# Requires beautifulsoup4, lxml, playwright to be installed in the environment
-# Run `playwright install` after installing the playwright python package
+# Requires httpx[http2], beautifulsoup4, lxml, playwright to be installed in the environment (selectolax is optional but much faster)
+# Run `playwright install` after installing the playwright python package (only used when plain HTTP gets challenged)
+
+SIMPLYHIRED_SEARCH_URL = "https://www.simplyhired.com/search?q={query}&l={location}&pn={page}"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+MAX_CONCURRENT_PAGES = 5 # Upper bound on Simply Hired pages in flight at once, across all tool calls
+MAX_NAVIGATION_ATTEMPTS = 3
+RETRYABLE_STATUSES = {429, 503} # Rate limited / temporarily unavailable
+BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media", "other"} # Only the HTML is parsed
+MIN_RESULTS_PAGE_CHARS = 5000 # Anything shorter is an interstitial, not a results page
+# Interstitial-only markers. Plain "/cdn-cgi/challenge-platform/" also matches Cloudflare's JS detection
+# script, which is injected into normal pages, so only the challenge page's own paths are listed.
+BOT_CHALLENGE_MARKERS = ("/cdn-cgi/challenge-platform/h/", "cf_chl_opt", "<title>Just a moment...</title>", "px-captcha")
+SAVE_HTML = bool(os.getenv("ADK_SAVE_HTML")) # Set to dump each result page into downloads/ for debugging
+
+JOB_CARD_SELECTOR = 'div[data-testid="searchSerpJob"]'
+JOB_CARD_MARKER = 'data-testid="searchSerpJob"' # Raw-text form of the card attribute
+JOB_TITLE_LINK_SELECTOR = 'h2[data-testid="searchSerpJobTitle"] a'
+JOB_COMPANY_SELECTOR = 'span[data-testid="companyName"]'
+JOB_LOCATION_SELECTOR = 'span[data-testid="searchSerpJobLocation"]'
+
+# Shared by every scrape so concurrent tool calls together stay under the per-host cap
+_host_sem = None
+_host_sem_loop = None
+
+def _host_semaphore() -> asyncio.BoundedSemaphore:
+    """Returns the per-host semaphore for the running event loop, creating a new one when the loop changes."""
+    global _host_sem, _host_sem_loop
+    loop = asyncio.get_running_loop()
+    if _host_sem_loop is not loop:
+        # A semaphore is bound to the first loop that waits on it and cannot be used from a later asyncio.run
+        _host_sem = asyncio.BoundedSemaphore(MAX_CONCURRENT_PAGES)
+        _host_sem_loop = loop
+    return _host_sem
+
+# Chromium is launched once and reused across tool calls; each call gets its own context
+_playwright = None
+_browser = None
+_browser_loop = None
+_browser_lock = None
+_browser_lock_loop = None
+
+def _browser_launch_lock() -> asyncio.Lock:
+    """Returns the lock guarding the browser launch for the running event loop, creating a new one when the loop changes."""
+    global _browser_lock, _browser_lock_loop
+    loop = asyncio.get_running_loop()
+    if _browser_lock_loop is not loop:
+        _browser_lock = asyncio.Lock()
+        _browser_lock_loop = loop
+    return _browser_lock
+
+async def _get_browser():
+    """Returns the shared headless Chromium instance, launching it on first use."""
+    global _playwright, _browser, _browser_loop
+    loop = asyncio.get_running_loop()
+    # Concurrent tool calls would otherwise each launch a browser, leaking all but the last
+    async with _browser_launch_lock():
+        if _browser is not None and _browser_loop is not loop:
+            # Created by an event loop that has since finished (e.g. a previous asyncio.run); it cannot be reused
+            _playwright = _browser = _browser_loop = None
+        elif _browser is not None and not _browser.is_connected():
+            print("ADK Agent - Cached browser disconnected. Relaunching...")
+            await _close_browser()
+        if _browser is None:
+            from playwright.async_api import async_playwright
+            print("ADK Agent - Launching shared browser...")
+            playwright = await async_playwright().start()
+            try:
+                browser = await playwright.chromium.launch(headless=True)
+            except Exception:
+                # Otherwise the driver process outlives the failed launch
+                await playwright.stop()
+                raise
+            _playwright, _browser, _browser_loop = playwright, browser, loop
+        return _browser
+
+async def _close_browser():
+    """Closes the shared browser and stops the Playwright driver, if they were started."""
+    global _playwright, _browser, _browser_loop
+    browser, playwright = _browser, _playwright
+    _playwright = _browser = _browser_loop = None
+    if browser is not None and browser.is_connected():
+        print("ADK Agent - Closing browser...")
+        await browser.close()
+    if playwright is not None:
+        await playwright.stop()
+
+# Strong references to fire-and-forget write tasks (HTML dumps, Google Sheets saves) so they are
+# not garbage collected mid-flight
+_pending_writes = set()
+
+def _run_in_background(func, *args):
+    """Runs a blocking function in a worker thread without awaiting it."""
+    task = asyncio.create_task(asyncio.to_thread(func, *args))
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+    return task
+
+async def shutdown():
+    """Waits for pending background writes, then closes the shared browser."""
+    if _pending_writes:
+        print(f"ADK Agent - Waiting for {len(_pending_writes)} pending background writes...")
+        await asyncio.gather(*_pending_writes, return_exceptions=True)
+    await _close_browser()
+
+def _shutdown_at_exit():
+    # Only possible while the owning loop is still usable. Otherwise the Playwright driver exits along
+    # with this process, and writes already running in worker threads are joined by the interpreter.
+    loop = _browser_loop or next((task.get_loop() for task in _pending_writes), None)
+    if loop is None or loop.is_closed() or loop.is_running():
+        return
+    loop.run_until_complete(shutdown())
+
+atexit.register(_shutdown_at_exit)
+
+def _save_html(output_filename: str, html_content: str, page_num: int):
+    try:
+        with open(output_filename, "w", encoding="utf-8") as f:
+            f.write(html_content)
+        print(f"ADK Agent - HTML for page {page_num} saved to: {output_filename}")
+    except Exception as e:
+        print(f"ADK Agent - Error saving HTML for page {page_num}: {e}")
+
+async def _request_with_backoff(send, url: str):
+    """
+    Calls send() until the host stops answering 429/503, with exponential backoff between attempts.
+    send must return a (response, status_code) tuple; the last response is returned either way.
+    """
+    for attempt in range(1, MAX_NAVIGATION_ATTEMPTS + 1):
+        # Small jitter so concurrent requests don't hit the host in lockstep
+        await asyncio.sleep(random.uniform(0.1, 0.3))
+        response, status = await send()
+        if status not in RETRYABLE_STATUSES or attempt == MAX_NAVIGATION_ATTEMPTS:
+            return response
+        delay = 2 ** attempt + random.uniform(0, 1)
+        print(f"ADK Agent - HTTP {status} from {url}. Retrying in {delay:.1f}s ({attempt}/{MAX_NAVIGATION_ATTEMPTS})...")
+        await asyncio.sleep(delay)
+
+async def _goto_with_backoff(page, url: str):
+    """Navigates a Playwright page to url, backing off while the host answers 429/503."""
+    async def send():
+        response = await page.goto(url, timeout=15000, wait_until='commit')
+        return response, response.status if response else None
+    return await _request_with_backoff(send, url)
+
+def _looks_like_bot_challenge(html_content: str) -> bool:
+    """A page with job cards is always a results page; otherwise it is a challenge if it is short or carries a marker."""
+    if JOB_CARD_MARKER in html_content:
+        return False
+    return len(html_content) < MIN_RESULTS_PAGE_CHARS or any(marker in html_content for marker in BOT_CHALLENGE_MARKERS)
+
+async def _fetch_pages_over_http(page_numbers: list[int], urls: list[str]) -> list:
+    """
+    Fetches the server-rendered result pages with plain HTTP requests, concurrently over one HTTP/2 client.
+    Returns the HTML per page, or None for pages that need the browser (bot challenge or request failure).
+    """
+    headers = {
+        "User-Agent": USER_AGENT,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+    async with httpx.AsyncClient(http2=True, headers=headers, follow_redirects=True, timeout=15) as client:
+        async def fetch(page_num: int, url: str):
+            async def send():
+                response = await client.get(url)
+                return response, response.status_code
+            try:
+                async with _host_semaphore():
+                    print(f"ADK Agent - Fetching page {page_num}: {url}")
+                    response = await _request_with_backoff(send, url)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"ADK Agent - HTTP fetch failed for page {page_num}: {e}. Will retry in the browser.")
+                return None
+            if _looks_like_bot_challenge(response.text):
+                print(f"ADK Agent - Page {page_num} returned a bot challenge ({len(response.text)} chars). Will retry in the browser.")
+                return None
+            return response.text
+
+        return await asyncio.gather(*[fetch(page_num, url) for page_num, url in zip(page_numbers, urls)])
+
+async def _block_unneeded_resources(route):
+    """Playwright route handler that aborts requests the scraper never looks at."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+# Runs inside Chromium: one [title, href, company, location] entry per job card, null where missing
+_EXTRACT_CARDS_JS = """(cards, [titleLinkSelector, companySelector, locationSelector]) => cards.map(card => {
+    const text = el => el ? el.textContent.trim() : null;
+    const titleLink = card.querySelector(titleLinkSelector);
+    return [
+        text(titleLink),
+        titleLink ? titleLink.getAttribute('href') : null,
+        text(card.querySelector(companySelector)),
+        text(card.querySelector(locationSelector)),
+    ];
+})"""
+
+def _extract_cards_with_selectolax(html_content: str) -> list[tuple]:
+    """Returns (title, href, company, location) for each job card, using selectolax's lexbor parser."""
+    tree = LexborHTMLParser(html_content)
+    cards = []
+    for job_card in tree.css(JOB_CARD_SELECTOR):
+        title_link = job_card.css_first(JOB_TITLE_LINK_SELECTOR)
+        company_element = job_card.css_first(JOB_COMPANY_SELECTOR)
+        location_element = job_card.css_first(JOB_LOCATION_SELECTOR)
+        cards.append((
+            title_link.text().strip() if title_link else None,
+            title_link.attributes.get('href') if title_link else None,
+            company_element.text().strip() if company_element else None,
+            location_element.text().strip() if location_element else None,
+        ))
+    return cards
+
+@functools.lru_cache(maxsize=1)
+def _soup_matchers():
+    """
+    Imports bs4 on first use and compiles the fallback parser's matchers once, so job card lookups
+    skip bs4's per-call matcher setup. Returns (strainer, title link, company, location).
+    """
+    from bs4 import SoupStrainer
+    import soupsieve
+    return (
+        SoupStrainer('div', attrs={'data-testid': 'searchSerpJob'}),
+        soupsieve.compile(JOB_TITLE_LINK_SELECTOR),
+        soupsieve.compile(JOB_COMPANY_SELECTOR),
+        soupsieve.compile(JOB_LOCATION_SELECTOR),
+    )
+
+def _extract_cards_with_beautifulsoup(html_content: str) -> list[tuple]:
+    """Returns (title, href, company, location) for each job card, using BeautifulSoup."""
+    from bs4 import BeautifulSoup
+    job_card_strainer, title_link_selector, company_selector, location_selector = _soup_matchers()
+    # Only build the job card subtrees; the rest of the page is navigation and script boilerplate
+    soup = BeautifulSoup(html_content, 'lxml', parse_only=job_card_strainer)
+    cards = []
+    for job_card in soup.find_all('div', recursive=False):
+        title_link = title_link_selector.select_one(job_card)
+        company_element = company_selector.select_one(job_card)
+        location_element = location_selector.select_one(job_card)
+        cards.append((
+            title_link.text.strip() if title_link else None,
+            title_link['href'] if title_link and title_link.has_attr('href') else None,
+            company_element.text.strip() if company_element else None,
+            location_element.text.strip() if location_element else None,
+        ))
+    return cards
+
+def _results_fragment(html_content: str) -> str:
+    """
+    Cuts a results page down to its <main> element, which holds the job cards, so the <head>, inline
+    scripts and JSON payloads never reach the parser. Returns the whole document if any card falls outside it.
+    """
+    start = html_content.find('<main')
+    end = html_content.rfind('</main>')
+    first_card = html_content.find(JOB_CARD_MARKER)
+    if start == -1 or end < start or (first_card != -1 and (first_card < start or html_content.rfind(JOB_CARD_MARKER) > end)):
+        return html_content
+    return html_content[start:end + len('</main>')]
 
 def parse_html_with_beautifulsoup(html_content: str, page_number: int) -> list[dict]:
     """
     Parses the HTML content of a Simply Hired search results page to extract job postings.
+    Uses selectolax when it is installed and falls back to BeautifulSoup otherwise.
     """
-    soup = BeautifulSoup(html_content, 'lxml')
+    html_content = _results_fragment(html_content)
+    if LexborHTMLParser is not None:
+        job_cards = _extract_cards_with_selectolax(html_content)
+    else:
+        job_cards = _extract_cards_with_beautifulsoup(html_content)
+    return _jobs_from_cards(job_cards, page_number)
+
+def _jobs_from_cards(job_cards: list[tuple], page_number: int) -> list[dict]:
+    """Turns raw (title, href, company, location) card tuples into job posting dicts."""
     jobs = []
-    job_cards = soup.find_all('div', attrs={'data-testid': 'searchSerpJob'})
 
     print(f"ADK Agent - Page {page_number}: Found {len(job_cards)} job cards.")
 
-    for job_card in job_cards:
-        title_element = job_card.find('h2', attrs={'data-testid': 'searchSerpJobTitle'})
-        title_link = title_element.find('a') if title_element else None
-        title = title_link.text.strip() if title_link else "N/A"
-        
-        url = title_link['href'] if title_link and title_link.has_attr('href') else "N/A"
+    for title, url, company, location in job_cards:
+        title = title or "N/A"
+        url = url or "N/A"
         if url != "N/A" and not url.startswith('http'):
             url = f"https://www.simplyhired.com{url}"
 
-        company_element = job_card.find('span', attrs={'data-testid': 'companyName'})
-        company = company_element.text.strip() if company_element else "N/A"
-
-        location_element = job_card.find('span', attrs={'data-testid': 'searchSerpJobLocation'})
-        location = location_element.text.strip() if location_element else "N/A"
-
         if title != "N/A":
             jobs.append({
                 "title": title,
-                "company": company,
-                "location": location,
+                "company": company or "N/A",
+                "location": location or "N/A",
                 "url": url,
                 "page_scraped": page_number
             })
     return jobs
 
+def _add_unique_jobs(all_jobs: list[dict], new_jobs: list[dict], seen_urls: set) -> int:
+    """Appends jobs whose URL has not been seen yet, keeping the first occurrence. Returns how many were added."""
+    added = 0
+    for job in new_jobs:
+        url = job["url"]
+        if url != "N/A":
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+        all_jobs.append(job)
+        added += 1
+    return added
+
 async def find_jobs_on_simplyhired(job_role: str, location: str = "United States", max_pages: int = 1) -> list[dict]:
     """
-    Scrapes job postings from Simply Hired for a given job role and location using Playwright and BeautifulSoup.
+    Scrapes job postings from Simply Hired for a given job role and location.
+    Result pages are fetched concurrently over plain HTTP; pages that get a bot challenge are retried in Playwright.
     It can scrape multiple pages as specified by max_pages.
     Also saves the found jobs to a configured Google Sheet.
     Args:
@@ -75,120 +353,133 @@ async def find_jobs_on_simplyhired(job_role: str, location: str = "United States
                     (title, company, location, url, page_scraped). Returns an empty list if no jobs are found
                     or an error occurs.
     """
+    # Imported here rather than at module load so the agent starts answering sooner
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
     print(f"ADK Agent - Starting Simply Hired scrape for role: '{job_role}', location: '{location}', max_pages: {max_pages}")
     all_extracted_jobs = []
-    browser = None
+    seen_urls = set() # Boosted listings repeat across result pages
     context = None
 
     # Ensure downloads directory exists (within adk-backend for this agent)
     downloads_dir = os.path.join(os.path.dirname(__file__), "downloads")
-    os.makedirs(downloads_dir, exist_ok=True)
+    if SAVE_HTML:
+        os.makedirs(downloads_dir, exist_ok=True)
 
-    async with async_playwright() as playwright:
-        try:
-            browser = await playwright.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            )
-            page = await context.new_page()
-
-            for page_num in range(1, max_pages + 1):
-                print(f"ADK Agent - --- Processing Page {page_num} ---")
-                html_content = None
-                current_url = ""
-
-                if page_num == 1:
-                    search_role_query = job_role.replace(" ", "+")
-                    search_location_query = location.replace(" ", "+")
-                    target_url = f"https://www.simplyhired.com/search?q={search_role_query}&l={search_location_query}"
-                    print(f"ADK Agent - Navigating to initial URL: {target_url}")
-                    await page.goto(target_url, timeout=60000, wait_until='domcontentloaded')
-                    current_url = target_url
-                else:
-                    next_page_selector = f"[data-testid='paginationBlock{page_num}']" # Example, may need adjustment
-                    print(f"ADK Agent - Attempting to find and click link for page {page_num} using selector: {next_page_selector}")
-                    
-                    try:
-                        next_page_link = page.locator(next_page_selector)
-                        if await next_page_link.count() > 0:
-                            await next_page_link.first.click(timeout=10000) # Added timeout
-                            await page.wait_for_load_state('domcontentloaded', timeout=30000)
-                            await asyncio.sleep(3) # Give time for dynamic content
-                            current_url = page.url
-                            print(f"ADK Agent - Navigated to page {page_num}. Current URL: {current_url}")
-                        else:
-                            print(f"ADK Agent - Could not find link for page {page_num}. Stopping pagination.")
-                            break
-                    except PlaywrightTimeoutError:
-                        print(f"ADK Agent - Timeout clicking next page link for page {page_num}. Stopping pagination.")
-                        break
-                    except Exception as e:
-                        print(f"ADK Agent - Error clicking next page link for page {page_num}: {e}. Stopping pagination.")
-                        break
-                
-                html_content = await page.content()
-                print(f"ADK Agent - Retrieved HTML from {current_url} (length: {len(html_content)} chars).")
-
-                if html_content:
-                    output_filename = os.path.join(downloads_dir, f"downloaded_page_{page_num}.html")
-                    try:
-                        with open(output_filename, "w", encoding="utf-8") as f:
-                            f.write(html_content)
-                        print(f"ADK Agent - HTML for page {page_num} saved to: {output_filename}")
-                    except Exception as e:
-                        print(f"ADK Agent - Error saving HTML for page {page_num}: {e}")
-                    
+    # Simply Hired addresses result pages directly via `pn`, so every page URL is known up front
+    search_role_query = job_role.replace(" ", "+")
+    search_location_query = location.replace(" ", "+")
+    page_numbers = list(range(1, max_pages + 1))
+    target_urls = [
+        SIMPLYHIRED_SEARCH_URL.format(query=search_role_query, location=search_location_query, page=page_num)
+        for page_num in page_numbers
+    ]
+
+    try:
+        # Happy path: the result pages are server-rendered, so plain HTTP is enough
+        results_by_page = {}
+        pages_to_parse = []
+        browser_pages = []
+        http_pages = await _fetch_pages_over_http(page_numbers, target_urls)
+        for page_num, url, html_content in zip(page_numbers, target_urls, http_pages):
+            if html_content is None:
+                browser_pages.append((page_num, url))
+                continue
+            print(f"ADK Agent - Retrieved HTML from {url} (length: {len(html_content)} chars).")
+            if SAVE_HTML:
+                # Debug artifact only; written off the event loop so parsing starts immediately
+                output_filename = os.path.join(downloads_dir, f"downloaded_page_{page_num}.html")
+                _run_in_background(_save_html, output_filename, html_content, page_num)
+            pages_to_parse.append((page_num, html_content))
+        # Parse every page in worker threads so the loop stays free (and overlaps with any browser fallback)
+        parse_results = asyncio.gather(
+            *[asyncio.to_thread(parse_html_with_beautifulsoup, html_content, page_num) for page_num, html_content in pages_to_parse],
+            return_exceptions=True
+        )
+
+        if browser_pages:
+            print(f"ADK Agent - Falling back to the browser for {len(browser_pages)} page(s).")
+
+            async def scrape_page(page_num: int, url: str) -> list[dict]:
+                async with _host_semaphore():
+                    page = await context.new_page()
                     try:
-                        jobs_from_page = parse_html_with_beautifulsoup(html_content, page_num)
-                        if jobs_from_page:
-                            all_extracted_jobs.extend(jobs_from_page)
-                            print(f"ADK Agent - Successfully parsed {len(jobs_from_page)} jobs from page {page_num}.")
-                    except Exception as e:
-                        print(f"ADK Agent - Error parsing with BeautifulSoup for page {page_num}: {e}")
-                else:
-                    print(f"ADK Agent - No HTML content for page {page_num}, skipping parsing.")
-            
-        except PlaywrightTimeoutError as pte:
-            print(f"ADK Agent - A Playwright timeout occurred: {pte}")
-            # Optionally, save whatever was collected before the timeout if all_extracted_jobs is not empty
-            if all_extracted_jobs:
-                print(f"ADK Agent - Saving {len(all_extracted_jobs)} jobs collected before timeout to Google Sheets.")
-                try:
-                    await asyncio.to_thread(save_jobs_to_google_sheet, all_extracted_jobs)
-                except Exception as sheet_error:
-                    print(f"ADK Agent - Error saving to Google Sheets after Playwright timeout: {sheet_error}")
-            return [{"error": "Playwright timeout", "details": str(pte), "jobs_collected_before_timeout": len(all_extracted_jobs)}]
-        except Exception as e:
-            print(f"ADK Agent - An unexpected error occurred in find_jobs_on_simplyhired: {e}")
-            # Optionally, save whatever was collected before the error
-            if all_extracted_jobs:
-                print(f"ADK Agent - Saving {len(all_extracted_jobs)} jobs collected before error to Google Sheets.")
-                try:
-                    await asyncio.to_thread(save_jobs_to_google_sheet, all_extracted_jobs)
-                except Exception as sheet_error:
-                    print(f"ADK Agent - Error saving to Google Sheets after unexpected error: {sheet_error}")
-            return [{"error": "Unexpected error during scraping", "details": str(e), "jobs_collected_before_error": len(all_extracted_jobs)}]
-        finally:
-            if context:
-                await context.close()
-            if browser:
-                print("ADK Agent - Closing browser...")
-                await browser.close()
-        
-        print(f"ADK Agent - Finished scraping. Total jobs found: {len(all_extracted_jobs)}")
-        
-        if all_extracted_jobs:
-            print(f"ADK Agent - Attempting to save {len(all_extracted_jobs)} jobs to Google Sheets...")
+                        print(f"ADK Agent - Navigating to page {page_num}: {url}")
+                        await _goto_with_backoff(page, url)
+                        try:
+                            # The rendered job cards are the actual readiness signal, not the load events
+                            await page.wait_for_selector(JOB_CARD_SELECTOR, timeout=10000)
+                        except PlaywrightTimeoutError:
+                            print(f"ADK Agent - No job cards appeared on page {page_num} within 10s.")
+                        if SAVE_HTML:
+                            # Debug artifact only; written off the event loop so extraction starts immediately
+                            output_filename = os.path.join(downloads_dir, f"downloaded_page_{page_num}.html")
+                            _run_in_background(_save_html, output_filename, await page.content(), page_num)
+                        # Walk the DOM inside Chromium and ship back only the card fields, not the whole page
+                        job_cards = await page.eval_on_selector_all(
+                            JOB_CARD_SELECTOR,
+                            _EXTRACT_CARDS_JS,
+                            [JOB_TITLE_LINK_SELECTOR, JOB_COMPANY_SELECTOR, JOB_LOCATION_SELECTOR]
+                        )
+                        return _jobs_from_cards([tuple(card) for card in job_cards], page_num)
+                    finally:
+                        await page.close()
+
             try:
-                # Run the synchronous save_jobs_to_google_sheet in a separate thread
-                await asyncio.to_thread(save_jobs_to_google_sheet, all_extracted_jobs)
-                print("ADK Agent - Job saving to Google Sheets initiated.")
+                browser = await _get_browser()
+                context = await browser.new_context(user_agent=USER_AGENT)
+                await context.route("**/*", _block_unneeded_resources)
+                browser_results = await asyncio.gather(
+                    *[scrape_page(page_num, url) for page_num, url in browser_pages],
+                    return_exceptions=True
+                )
             except Exception as e:
-                # Log error but don't let it prevent returning jobs to the user
-                print(f"ADK Agent - Error initiating job saving to Google Sheets: {e}")
-                # The save_jobs_to_google_sheet function itself has more detailed error logging.
+                # Only the challenged pages are lost; the pages fetched over HTTP are still parsed below
+                print(f"ADK Agent - Browser fallback failed: {e}")
+                browser_results = [e] * len(browser_pages)
+            results_by_page.update(zip((page_num for page_num, _ in browser_pages), browser_results))
+        results_by_page.update(zip((page_num for page_num, _ in pages_to_parse), await parse_results))
+
+        page_results = [results_by_page[page_num] for page_num in page_numbers]
+
+        # Surface the failure to the handlers below if not a single page could be scraped
+        if page_results and all(isinstance(result, BaseException) for result in page_results):
+            raise page_results[0]
+
+        for page_num, current_url, jobs_from_page in zip(page_numbers, target_urls, page_results):
+            if isinstance(jobs_from_page, BaseException):
+                print(f"ADK Agent - Error scraping page {page_num} ({current_url}): {jobs_from_page}")
+                continue
+            if jobs_from_page:
+                added = _add_unique_jobs(all_extracted_jobs, jobs_from_page, seen_urls)
+                print(f"ADK Agent - Successfully extracted {len(jobs_from_page)} jobs from page {page_num} ({len(jobs_from_page) - added} duplicates skipped).")
+        
+    except PlaywrightTimeoutError as pte:
+        print(f"ADK Agent - A Playwright timeout occurred: {pte}")
+        return [{"error": "Playwright timeout", "details": str(pte)}]
+    except Exception as e:
+        print(f"ADK Agent - An unexpected error occurred in find_jobs_on_simplyhired: {e}")
+        return [{"error": "Unexpected error during scraping", "details": str(e)}]
+    finally:
+        # The browser is shared across tool calls; only this call's context is closed
+        if context:
+            await context.close()
+    
+    print(f"ADK Agent - Finished scraping. Total jobs found: {len(all_extracted_jobs)}")
+    
+    if all_extracted_jobs:
+        print(f"ADK Agent - Attempting to save {len(all_extracted_jobs)} jobs to Google Sheets...")
+        try:
+            # Run the synchronous save_jobs_to_google_sheet in a background thread so the tool
+            # returns without waiting on the Sheets API round-trip
+            _run_in_background(save_jobs_to_google_sheet, all_extracted_jobs)
+            print("ADK Agent - Job saving to Google Sheets initiated.")
+        except Exception as e:
+            # Log error but don't let it prevent returning jobs to the user
+            print(f"ADK Agent - Error initiating job saving to Google Sheets: {e}")
+            # The save_jobs_to_google_sheet function itself has more detailed error logging.
 
-        return all_extracted_jobs
+    return all_extracted_jobs
 
 root_agent = Agent(
     name="job_search_agent",
@@ -239,6 +530,7 @@ async def _test_tool():
         print(f"\nError during scraping: {jobs[0]['error']} - {jobs[0].get('details', '')}")
     else:
         print("\nNo jobs found or an issue occurred.")
+    await shutdown()
 
 if __name__ == '__main__':
     # To run the test: python -m adk-backend.agent 
@@ -1,8 +1,7 @@
 import os
-import datetime
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+import time
+import functools
+import threading
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -11,7 +10,17 @@ load_dotenv() # Loads variables from .env in the current or parent directory.
 
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 DEFAULT_SHEET_NAME = os.getenv('DEFAULT_SHEET_NAME', 'Sheet1')
+MAX_ROWS_PER_REQUEST = 5000 # Larger batches are split into several append requests
 
+# The Sheets client is built once and reused. Saves run in worker threads (asyncio.to_thread)
+# and the underlying httplib2 transport is not thread-safe, so access is serialized.
+_SERVICE = None
+_SERVICE_LOCK = threading.Lock()
+
+# Resolved once; the credentials file does not move while the agent is running
+_CREDS_PATH = None
+
+@functools.lru_cache(maxsize=1)
 def get_spreadsheet_id():
     spreadsheet_id = os.getenv('SPREADSHEET_ID')
     if not spreadsheet_id:
@@ -19,7 +28,11 @@ def get_spreadsheet_id():
         raise ValueError("SPREADSHEET_ID not configured in .env file. Please add it to adk-backend/.env")
     return spreadsheet_id
 
-def get_google_credentials():
+def _resolve_credentials_path():
+    global _CREDS_PATH
+    if _CREDS_PATH is not None:
+        return _CREDS_PATH
+
     creds_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
     if not creds_path:
         print("Error: GOOGLE_APPLICATION_CREDENTIALS environment variable not set.")
@@ -38,7 +51,14 @@ def get_google_credentials():
         print(f"Error: Credentials file not found at the resolved path: {creds_path}")
         print(f"Original path specified: {os.getenv('GOOGLE_APPLICATION_CREDENTIALS')}")
         raise FileNotFoundError(f"Service account key file not found at {creds_path}")
-    
+
+    _CREDS_PATH = creds_path
+    return creds_path
+
+@functools.lru_cache(maxsize=1)
+def get_google_credentials():
+    from google.oauth2 import service_account
+    creds_path = _resolve_credentials_path()
     try:
         credentials = service_account.Credentials.from_service_account_file(
             creds_path, scopes=SCOPES)
@@ -47,22 +67,33 @@ def get_google_credentials():
         print(f"Error loading service account credentials from {creds_path}: {e}")
         raise
 
+def _get_service():
+    """Returns the cached Sheets API client, building it on first use. Callers must hold _SERVICE_LOCK."""
+    global _SERVICE
+    if _SERVICE is None:
+        from googleapiclient.discovery import build
+        # The bundled (static) discovery document is used, so building makes no HTTP request
+        _SERVICE = build('sheets', 'v4', credentials=get_google_credentials(), cache_discovery=False)
+    return _SERVICE
+
 def save_jobs_to_google_sheet(jobs_data: list[dict]):
     """
     Saves a list of job data to the configured Google Spreadsheet.
     Assumes the first row of the sheet contains headers:
     ["Date Added", "Title", "Company", "Location", "URL"]
+    Values are written as RAW: nothing is evaluated as a formula, and "Date Added" is stored as plain text.
     Args:
         jobs_data (list[dict]): A list of job dictionaries.
     """
     if not jobs_data:
         print("Google Sheets: No job data provided to save.")
         return
+    from googleapiclient.errors import HttpError
 
     try:
         spreadsheet_id = get_spreadsheet_id()
-        credentials = get_google_credentials()
-        service = build('sheets', 'v4', credentials=credentials)
+        with _SERVICE_LOCK:
+            service = _get_service()
     except (ValueError, FileNotFoundError) as e:
         print(f"Google Sheets: Error initializing service: {e}")
         return
@@ -73,30 +104,34 @@ def save_jobs_to_google_sheet(jobs_data: list[dict]):
         print(f"Google Sheets: Unexpected error during service initialization: {e}")
         return
 
-    current_timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    values_to_append = []
-    for job in jobs_data:
-        values_to_append.append([
-            current_timestamp,                      # Date Added
+    current_timestamp = time.strftime("%Y-%m-%d %H:%M:%S") # One local-time stamp for the whole batch
+    values_to_append = [
+        [
+            current_timestamp,                  # Date Added
             job.get('title', 'N/A'),            # Title
             job.get('company', 'N/A'),          # Company
             job.get('location', 'N/A'),         # Location
             job.get('url', 'N/A')               # URL
-        ])
+        ]
+        for job in jobs_data
+    ]
 
-    body = {'values': values_to_append}
     sheet_name_to_use = DEFAULT_SHEET_NAME
 
     try:
         print(f"Google Sheets: Appending {len(values_to_append)} rows to ID: {spreadsheet_id}, Sheet: {sheet_name_to_use} (Source Page column removed).")
-        result = service.spreadsheets().values().append(
-            spreadsheetId=spreadsheet_id,
-            range=f"{sheet_name_to_use}!A1",
-            valueInputOption='USER_ENTERED',
-            insertDataOption='INSERT_ROWS',
-            body=body
-        ).execute()
-        print(f"Google Sheets: {result.get('updates', {}).get('updatedCells', 0)} cells appended.")
+        # Chunks are sent one after another: concurrent appends to the same sheet race for the table end
+        for chunk_start in range(0, len(values_to_append), MAX_ROWS_PER_REQUEST):
+            body = {'values': values_to_append[chunk_start:chunk_start + MAX_ROWS_PER_REQUEST]}
+            with _SERVICE_LOCK:
+                result = service.spreadsheets().values().append(
+                    spreadsheetId=spreadsheet_id,
+                    range=f"{sheet_name_to_use}!A1",
+                    valueInputOption='RAW',
+                    insertDataOption='INSERT_ROWS',
+                    body=body
+                ).execute()
+            print(f"Google Sheets: {result.get('updates', {}).get('updatedCells', 0)} cells appended.")
     except HttpError as error:
         print(f"Google Sheets: API error: {error}. Details: {error.resp.status} {error.resp.reason} - {error.content}")
     except Exception as e:
@@ -1,18 +1,23 @@
-import platform
+import sys
 import asyncio
 import os
 import json
 import re
+import hashlib
+import itertools
+import functools
 
-if platform.system() == "Windows":
+if sys.platform == "win32" and not isinstance(asyncio.get_event_loop_policy(), asyncio.WindowsSelectorEventLoopPolicy):
     try:
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-        print("Intern Agent (Module Load): WindowsSelectorEventLoopPolicy set.")
     except Exception as e:
         print(f"Intern Agent (Module Load): Info/Error setting event loop policy: {e}.")
 
+import httpx
+import diskcache
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 from google.adk.agents import Agent
 from google.generativeai import types as genai_types
 import google.generativeai as genai
@@ -23,59 +28,239 @@ from .google_sheets_utils import save_jobs_to_google_sheet
 
 load_dotenv()
 
+# Shared by every Gemini helper; the library keeps its API client per process, so one model object suffices
+_GEMINI_MODEL = GenerativeModel('gemini-2.0-flash')
+
+# Compiled once: the listings are the first table inside GitHub's rendered markdown article
+_MARKDOWN_BODY_XPATH = etree.XPath("//article[contains(concat(' ', normalize-space(@class), ' '), ' markdown-body ')]")
+_FIRST_TABLE_XPATH = etree.XPath("(.//table)[1]")
+_CELLS_XPATH = etree.XPath("./td")
+# Sponsorship/citizenship badges stripped from role names in one pass. The US flag is a two-codepoint
+# sequence, so it must be matched as a whole to leave other flags intact.
+_ROLE_BADGES_RE = re.compile('🛂|🇺🇸')
+
+MAX_CONCURRENT_APPLICATIONS = 3 # Application tabs open at once in the shared browser
+# Unattended by default. Set AGENT_HEADLESS=0 to watch the browser and review each form before it closes.
+HEADLESS_MODE = os.getenv("AGENT_HEADLESS", "1") == "1"
+REVIEW_TIMEOUT_MS = 300_000 # Longest an open form waits for the user to close its tab in interactive mode
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+MAX_FETCH_ATTEMPTS = 3
+
+# Aborted on application pages. Stylesheets are kept: custom dropdowns rely on them to behave,
+# and the user reviews the filled-in form visually.
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+# Gemini results persisted across runs. ATS portals (Greenhouse, Lever, Workday) reuse the same form
+# templates across employers, so a plan for one form structure is valid for every job using it.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+PLAN_CACHE_TTL_SECONDS = 7 * 24 * 3600 # ATS templates change; cached plans are re-planned after a week
+
+@functools.lru_cache(maxsize=None)
+def _open_cache(name: str) -> diskcache.Cache:
+    """Opens (creating on first use) the named cache under CACHE_DIR, so importing the agent touches no files."""
+    return diskcache.Cache(os.path.join(CACHE_DIR, name))
+
+# Cookies and localStorage from the last completed application, so ATS sign-ins carry over to later jobs
+STORAGE_STATE_PATH = os.path.join(CACHE_DIR, "storage_state.json")
+_storage_state_lock = None
+_storage_state_lock_loop = None
+
+# What identifies a form field for the plan's selectors; copy, styling and values are left out of the key
+_SKELETON_ATTRIBUTES = ("id", "name", "type", "role", "for", "aria-label", "placeholder")
+_SKELETON_TEXT_TAGS = {"label", "legend", "option", "button"}
+
+# Elements and attributes sent to Gemini for planning. Everything else only costs input tokens.
+_NON_VISIBLE_TAGS = ("script", "style", "noscript", "svg", "template", etree.Comment)
+_PLAN_ATTRIBUTES = {
+    "id", "name", "type", "value", "for", "role", "href", "placeholder", "title", "alt",
+    "accept", "multiple", "required", "checked", "selected", "disabled",
+}
+
+# Structured output: Gemini returns JSON matching these schemas, with no markdown fences to strip
+_PLAN_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "plan": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "action": {"type": "STRING"},
+                    "selector": {"type": "STRING"},
+                    "user_data_key": {"type": "STRING"},
+                    "value_to_select": {"type": "STRING"},
+                    "option_text": {"type": "STRING"},
+                    "question_text": {"type": "STRING"},
+                },
+                "required": ["action", "selector"],
+            },
+        },
+    },
+    "required": ["plan"],
+}
+_ANSWERS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"answers": {"type": "ARRAY", "items": {"type": "STRING"}}},
+    "required": ["answers"],
+}
+_PLAN_GENERATION_CONFIG = genai_types.GenerationConfig(response_mime_type="application/json", response_schema=_PLAN_SCHEMA)
+_ANSWERS_GENERATION_CONFIG = genai_types.GenerationConfig(response_mime_type="application/json", response_schema=_ANSWERS_SCHEMA)
+
+def _hash_key(*parts: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _plan_cache_key(doc) -> str | None:
+    """
+    Hashes the structure of the page's forms: tags plus identifying attributes, and the text of labels
+    and options (which the plan maps onto user data). Returns None when the page has no form, since
+    landing pages differ in ways the skeleton can't capture.
+    """
+    forms = doc.xpath("//form")
+    if not forms:
+        return None
+
+    skeleton = []
+    for form in forms:
+        for el in form.iter():
+            if not isinstance(el.tag, str):
+                continue
+            attrs = ",".join(f"{name}={el.get(name)}" for name in _SKELETON_ATTRIBUTES if el.get(name) is not None)
+            text = el.text_content().strip() if el.tag in _SKELETON_TEXT_TAGS else ""
+            skeleton.append(f"{el.tag}[{attrs}]{text}")
+    return _hash_key(_USER_DATA_KEY_JSON, *skeleton)
+
+def _forget_plan(cache_key: str | None):
+    """Evicts a cached plan whose steps aborted the job, so the next job on this form asks Gemini again."""
+    if cache_key is not None:
+        _open_cache("plans").delete(cache_key)
+
+def _job_description_text(doc) -> str:
+    """Visible text of the posting, preferring the #content container, then <main>, then the whole body."""
+    container = doc.get_element_by_id('content', None)
+    if container is None:
+        container = doc.find('.//main')
+    if container is None:
+        container = doc.find('.//body')
+    if container is None:
+        container = doc
+    # Pieces are joined with a space so adjacent elements in minified markup don't run together
+    return ' '.join(piece.strip() for piece in container.itertext() if piece.strip())[:4000]
+
+def _trim_for_planning(doc) -> str:
+    """
+    Serializes the page for the planning prompt without the attributes Gemini doesn't need to write
+    selectors. Expects scripts, styles and other non-visible elements to have been stripped already.
+    """
+    for el in doc.iter():
+        if not isinstance(el.tag, str):
+            continue
+        for name in list(el.attrib):
+            if name not in _PLAN_ATTRIBUTES and not name.startswith(("aria-", "data-")):
+                del el.attrib[name]
+    return lxml.html.tostring(doc, encoding='unicode')
+
+async def _block_heavy_resources(route):
+    """Playwright route handler that aborts requests the autofill never needs."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+def _write_json_atomically(path: str, data) -> None:
+    """Writes data as JSON to a temp file and swaps it into place, so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+async def _save_storage_state(context):
+    """Saves the context's cookies and localStorage to STORAGE_STATE_PATH, one concurrent job at a time."""
+    global _storage_state_lock, _storage_state_lock_loop
+    loop = asyncio.get_running_loop()
+    if _storage_state_lock_loop is not loop:
+        # Locks are bound to the loop that first waits on them; each asyncio.run gets its own
+        _storage_state_lock = asyncio.Lock()
+        _storage_state_lock_loop = loop
+    state = await context.storage_state()
+    async with _storage_state_lock:
+        await asyncio.to_thread(_write_json_atomically, STORAGE_STATE_PATH, state)
+
+async def _get_with_retries(client, url: str):
+    """GETs url, retrying network errors, 429s and 5xx responses with exponential backoff."""
+    for attempt in range(1, MAX_FETCH_ATTEMPTS + 1):
+        try:
+            response = await client.get(url)
+            response.raise_for_status()
+            return response
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            retryable = isinstance(e, httpx.TransportError) or e.response.status_code == 429 or e.response.status_code >= 500
+            if not retryable or attempt == MAX_FETCH_ATTEMPTS:
+                raise
+            delay = 2 ** (attempt - 1)
+            print(f"Intern Agent: Fetching {url} failed ({e}). Retrying in {delay}s ({attempt}/{MAX_FETCH_ATTEMPTS})...")
+            await asyncio.sleep(delay)
+
 def parse_internship_table(html_content: str) -> list[dict]:
     """
     Parses the HTML content of the GitHub internship README to extract internship postings from the table.
     """
-    soup = BeautifulSoup(html_content, 'lxml')
+    doc = lxml.html.fromstring(html_content)
     internships = []
     
-    # The table is inside a div with class 'markdown-body'
-    markdown_body = soup.find('article', class_='markdown-body')
-    if not markdown_body:
+    # The table is inside an article with class 'markdown-body'
+    markdown_bodies = _MARKDOWN_BODY_XPATH(doc)
+    if not markdown_bodies:
         print("Intern Agent Parser: Could not find the 'markdown-body' article tag.")
         return []
 
-    table = markdown_body.find('table')
-    if not table or not table.find('tbody'):
+    tables = _FIRST_TABLE_XPATH(markdown_bodies[0])
+    tbody = tables[0].find('tbody') if tables else None
+    if tbody is None:
         print("Intern Agent Parser: Could not find the internship table or its tbody.")
         return []
 
     last_company = ""
-    rows = table.tbody.find_all('tr')
+    rows = tbody.findall('tr')
     print(f"Intern Agent Parser: Found {len(rows)} rows in the internship table.")
 
     for row in rows:
-        cells = row.find_all('td')
+        cells = _CELLS_XPATH(row)
         if len(cells) < 4:
             continue
 
-        company = cells[0].text.strip()
+        company = cells[0].text_content().strip()
         if company == '↳':
             company = last_company
         else:
             last_company = company
 
-        role = cells[1].text.strip().replace('🛂', '').replace('🇺🇸', '').strip()
+        role = _ROLE_BADGES_RE.sub('', cells[1].text_content().strip()).strip()
         location_cell = cells[2]
-        location = ' | '.join([part.strip() for part in location_cell.stripped_strings])
+        location = ' | '.join([part.strip() for part in location_cell.itertext() if part.strip()])
         
         # Define URL first
         application_cell = cells[3]
-        link_tag = application_cell.find('a')
-        url = "Closed"
-        if link_tag and link_tag.has_attr('href'):
-            url = link_tag['href']
-        elif '🔒' in application_cell.text:
-            continue # Skip closed applications
+        link_tag = application_cell.find('.//a')
+        href = link_tag.get('href') if link_tag is not None else None
+        if href is not None:
+            url = href
         else:
-            url = application_cell.text.strip()
+            application_text = application_cell.text_content()
+            if '🔒' in application_text:
+                continue # Skip closed applications
+            url = application_text.strip()
         
         # Now, check the URL
-        if not url.startswith('http'): 
+        if not url.startswith('http'):
             continue
 
-        date_posted = cells[4].text.strip() if len(cells) > 4 else "N/A"
+        date_posted = cells[4].text_content().strip() if len(cells) > 4 else "N/A"
 
         internships.append({
             "company": company,
@@ -101,13 +286,10 @@ async def find_and_apply_for_internships(github_url: str) -> list[dict]:
     # --- Part 1: Scrape the main list from GitHub ---
     initial_internships = []
     try:
-        async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=True)
-            page = await browser.new_page()
-            await page.goto(github_url, timeout=60000, wait_until='domcontentloaded')
-            html_content = await page.content()
-            await browser.close()
-            initial_internships = parse_internship_table(html_content)
+        # The README is rendered server-side, so a plain HTTP GET is enough; no browser needed
+        async with httpx.AsyncClient(http2=True, headers={"User-Agent": USER_AGENT}, follow_redirects=True, timeout=30) as client:
+            response = await _get_with_retries(client, github_url)
+            initial_internships = parse_internship_table(response.text)
             print(f"Intern Agent: Discovered {len(initial_internships)} potential internships from GitHub.")
     except Exception as e:
         print(f"Intern Agent: Failed to scrape GitHub list. Error: {e}")
@@ -130,36 +312,57 @@ async def find_and_apply_for_internships(github_url: str) -> list[dict]:
         # except Exception as e:
         #     print(f"Intern Agent: Error initiating saving to Google Sheets: {e}")
 
-    # --- Part 3: Loop through internships and attempt to apply ---
+    # --- Part 3: Apply to internships concurrently, sharing one browser ---
     print("\n--- Starting Stage 2: Autofill Application Process ---")
-    applied_count = 0
     max_applications = 5
     
-    jobs_to_apply = [job for job in initial_internships if job.get("url") and job["url"].startswith("http")]
+    # Stops filtering as soon as max_applications valid jobs are found. Listings that share an application
+    # link (e.g. several roles behind one careers page) are applied to only once.
+    seen_urls = set()
+    valid_jobs = (
+        job for job in initial_internships
+        if job.get("url", "").startswith("http") and job["url"] not in seen_urls and not seen_urls.add(job["url"])
+    )
+    jobs_to_apply = list(itertools.islice(valid_jobs, max_applications))
     
-    print(f"Found {len(jobs_to_apply)} jobs with valid application links. Attempting to apply to a max of {max_applications}.")
+    print(f"Attempting to apply to {len(jobs_to_apply)} jobs with valid application links (max {max_applications}).")
 
-    for job in jobs_to_apply:
-        if applied_count >= max_applications:
-            print(f"Reached max applications limit of {max_applications}.")
-            break
-        
-        url = job["url"]
-        print(f"\n({applied_count + 1}/{max_applications}) Attempting to apply for: {job['company']} - {job['role']} at {url}")
-        
-        result = await apply_for_internship(url)
-        
-        print(f"  -> Application result: {result.get('status')} - {result.get('message')}")
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_APPLICATIONS)
+    try:
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=HEADLESS_MODE)
+            # Every job starts from the state saved by the previous run; jobs in this run refresh it as they finish
+            storage_state = STORAGE_STATE_PATH if os.path.exists(STORAGE_STATE_PATH) else None
+
+            async def apply_bounded(index: int, job: dict) -> dict:
+                print(f"\n({index}/{len(jobs_to_apply)}) Queued application for: {job['company']} - {job['role']} at {job['url']}")
+                # The slot is released before any interactive review, so open tabs don't hold up the remaining jobs
+                return await apply_for_internship(browser, job["url"], storage_state, semaphore)
+
+            try:
+                results = await asyncio.gather(
+                    *[apply_bounded(index, job) for index, job in enumerate(jobs_to_apply, start=1)],
+                    return_exceptions=True
+                )
+            finally:
+                await browser.close()
+    except Exception as e:
+        print(f"Intern Agent: Failed to start the browser for applications. Error: {e}")
+        return initial_internships
+
+    applied_count = 0
+    for job, result in zip(jobs_to_apply, results):
+        if isinstance(result, BaseException):
+            result = {"status": "error", "message": str(result)}
+        print(f"\n  -> {job['company']} - {job['role']}: {result.get('status')} - {result.get('message')}")
         
-        if result and result.get("status") == "success":
+        if result.get("status") == "success":
             applied_count += 1
-        elif result and "No <form> tag found" in result.get("message", ""):
+        elif "No <form> tag found" in result.get("message", ""):
             print("  -> Skipping application as no form was found on the page.")
         else:
             print("  -> Application attempt failed or was aborted.")
         
-        await asyncio.sleep(2)
-        
     print(f"\n--- Autofill process finished. Attempted {applied_count} applications. ---")
     
     return initial_internships
@@ -214,10 +417,22 @@ USER_DATA = {
     "resume_path": "C:/Users/Samik/Downloads/exam2key.pdf" # IMPORTANT: Use an absolute path
 }
 
+# USER_DATA never changes at runtime, so it is serialized once rather than on every page
+_USER_DATA_PROMPT_JSON = json.dumps(USER_DATA, indent=2)
+_USER_DATA_KEY_JSON = json.dumps(USER_DATA, sort_keys=True)
+
+def _answer_cache_key(question: str, job_description: str, resume_text: str) -> str:
+    return _hash_key(question, job_description[:1000], resume_text)
+
 async def get_answer_from_gemini(question: str, job_description: str, resume_text: str) -> str:
     """Uses Gemini to generate a response to a custom application question."""
+    cache_key = _answer_cache_key(question, job_description, resume_text)
+    cached_answer = _open_cache("answers").get(cache_key)
+    if cached_answer is not None:
+        print(f"Agent (Question): Reusing cached answer for '{question[:50]}...'")
+        return cached_answer
+
     print(f"Agent (Question): Asking Gemini to answer the question: '{question[:50]}...'")
-    model = GenerativeModel('gemini-2.0-flash')
 
     prompt = f"""
     You are a professional career coach. A candidate is applying for a job.
@@ -245,24 +460,92 @@ async def get_answer_from_gemini(question: str, job_description: str, resume_tex
     """
 
     try:
-        response = await model.generate_content_async(prompt)
+        response = await _GEMINI_MODEL.generate_content_async(prompt)
         print("Agent (Question): Successfully generated an answer.")
-        return response.text.strip()
+        answer = response.text.strip()
+        _open_cache("answers")[cache_key] = answer
+        return answer
     except Exception as e:
         print(f"Agent (Question): Gemini failed to generate an answer. Error: {e}")
         return "Could not generate an answer."
 
-async def get_page_plan_from_gemini(html_content: str) -> dict:
-    """Uses Gemini to create a full plan of actions for a given webpage."""
+async def get_answers_from_gemini(questions: list[str], job_description: str, resume_text: str) -> list[str]:
+    """
+    Answers all of a page's application questions with a single Gemini request, in the same order.
+    Cached answers are reused; if the batched response can't be parsed, falls back to one request per question.
+    """
+    answers = [_open_cache("answers").get(_answer_cache_key(q, job_description, resume_text)) for q in questions]
+    pending = [i for i, answer in enumerate(answers) if answer is None]
+    if not pending:
+        print(f"Agent (Question): Reusing cached answers for all {len(questions)} questions on this page.")
+        return answers
+    if len(pending) == 1:
+        answers[pending[0]] = await get_answer_from_gemini(questions[pending[0]], job_description, resume_text)
+        return answers
+
+    print(f"Agent (Question): Asking Gemini to answer {len(pending)} questions in one request...")
+    numbered_questions = "\n".join(f'{n}. "{questions[i]}"' for n, i in enumerate(pending, start=1))
+
+    prompt = f"""
+    You are a professional career coach. A candidate is applying for a job.
+    Based on their resume and the job description, please provide a concise, professional, and well-written answer to each of the following application questions.
+
+    **Job Description:**
+    ```
+    {job_description}
+    ```
+
+    **Candidate's Resume:**
+    ```
+    {resume_text}
+    ```
+
+    **Application Questions:**
+    {numbered_questions}
+
+    **Instructions:**
+    - Keep each answer to 2-4 sentences.
+    - Be enthusiastic and professional.
+    - Directly address each question.
+    - Respond with a single, valid JSON object of the form `{{"answers": ["<answer to question 1>", "<answer to question 2>", ...]}}`, with exactly {len(pending)} answers in the same order as the questions.
+    """
+
+    try:
+        response = await _GEMINI_MODEL.generate_content_async(prompt, generation_config=_ANSWERS_GENERATION_CONFIG)
+        batched = json.loads(response.text).get("answers", [])
+        if len(batched) != len(pending) or not all(isinstance(answer, str) for answer in batched):
+            raise ValueError(f"expected {len(pending)} answers, got {batched!r:.200}")
+    except Exception as e:
+        print(f"Agent (Question): Batched answers failed ({e}). Falling back to one request per question.")
+        for i in pending:
+            answers[i] = await get_answer_from_gemini(questions[i], job_description, resume_text)
+        return answers
+
+    print(f"Agent (Question): Successfully generated {len(batched)} answers.")
+    for i, answer in zip(pending, batched):
+        answers[i] = answer.strip()
+        _open_cache("answers")[_answer_cache_key(questions[i], job_description, resume_text)] = answers[i]
+    return answers
+
+async def get_page_plan_from_gemini(html_content: str, cache_key: str | None = None) -> dict:
+    """
+    Uses Gemini to create a full plan of actions for a given webpage.
+    Plans are cached under cache_key when one is given (see _plan_cache_key).
+    """
+    if cache_key is not None:
+        cached_plan = _open_cache("plans").get(cache_key)
+        if cached_plan is not None:
+            print(f"Agent (Autofill): Reusing cached plan with {len(cached_plan.get('plan', []))} steps for this form.")
+            return cached_plan
+
     print("Agent (Autofill): Asking Gemini to create a plan for the current page...")
-    model = GenerativeModel('gemini-2.0-flash')
     
     prompt = f"""
     You are an expert web automation assistant. Your goal is to create a step-by-step plan to fill out a job application form based on the user's data.
     I will provide you with the current HTML of the web page. You must analyze it and return a complete plan of all the steps required to fill out the form on THIS PAGE.
 
     This is the user's data you need to use for filling the form:
-    {json.dumps(USER_DATA, indent=2)}
+    {_USER_DATA_PROMPT_JSON}
 
     Please respond with a single, valid JSON object containing a "plan" which is a list of action objects.
 
@@ -287,13 +570,12 @@ async def get_page_plan_from_gemini(html_content: str) -> dict:
     """
 
     try:
-        response = await model.generate_content_async(prompt)
-        cleaned_response = response.text.strip().replace("`", "")
-        if cleaned_response.startswith("json"):
-            cleaned_response = cleaned_response[4:]
-
-        plan_json = json.loads(cleaned_response)
+        response = await _GEMINI_MODEL.generate_content_async(prompt, generation_config=_PLAN_GENERATION_CONFIG)
+        plan_json = json.loads(response.text)
         print(f"Agent (Autofill): Gemini created a plan with {len(plan_json.get('plan', []))} steps.")
+        if cache_key is not None and plan_json.get("plan"):
+            # Failures fall through to the except below, and empty plans are not cached either
+            _open_cache("plans").set(cache_key, plan_json, expire=PLAN_CACHE_TTL_SECONDS)
         return plan_json
     except Exception as e:
         print(f"Agent (Autofill): Gemini failed to create a plan. Error: {e}")
@@ -301,124 +583,165 @@ async def get_page_plan_from_gemini(html_content: str) -> dict:
         return {"plan": []}
 
 
-async def apply_for_internship(job_url: str):
+async def apply_for_internship(browser, job_url: str, storage_state: str | None = None, slot: asyncio.Semaphore | None = None):
     """
     (Stage 2 - Plan-Based Approach)
     Navigates a job application using a plan from an LLM. Handles multi-page
     applications by generating a new plan after each navigation.
+    Runs in its own context of the shared browser, which the caller owns.
+    The context starts from storage_state when given, and its cookies are saved to
+    STORAGE_STATE_PATH once the form is filled.
+    When slot is given, it is held while the form is filled and released before the review pause.
     """
+    if slot is not None:
+        await slot.acquire()
+    holding_slot = slot is not None
     print(f"\n--- Starting Plan-Based Autofill for Job at {job_url} ---")
     
-    async with async_playwright() as playwright:
+    context = None
+    try:
         try:
-            browser = await playwright.chromium.launch(headless=False)
-            page = await browser.new_page()
-            print(f"Agent (Autofill): Navigating to {job_url}...")
-            await page.goto(job_url, timeout=60000)
-
-            max_pages_to_process = 10  # Safety break for navigation loops
-            for i in range(max_pages_to_process):
-                print(f"\n--- Analyzing Page {i + 1}/{max_pages_to_process} at {page.url} ---")
-                await page.wait_for_load_state('domcontentloaded', timeout=15000)
-                await asyncio.sleep(2)  # Wait for dynamic content
-
-                html_content = await page.content()
-
-                # Scrape job description for context-aware answers
-                soup = BeautifulSoup(html_content, 'lxml')
-                job_description_el = soup.find(id='content') or soup.find('main') or soup.body
-                job_description = job_description_el.get_text(' ', strip=True)[:4000]
-
-                page_plan_json = await get_page_plan_from_gemini(html_content)
-                page_plan = page_plan_json.get("plan", [])
-
-                if not page_plan:
-                    print("  -> Gemini found no further actions for this page. Ending application attempt.")
-                    break
-
-                navigated = False
-                for step_num, step in enumerate(page_plan):
-                    action = step.get("action", "FAIL")
-                    selector = step.get("selector")
-                    print(f"  [Step {step_num + 1}/{len(page_plan)}] Action: {action}, Selector: '{selector}'")
-
-                    if action == "FILL":
-                        key = step.get("user_data_key")
-                        value = USER_DATA.get(key)
-                        try:
-                            await page.locator(selector).first.fill(str(value))
-                        except Exception as e:
-                            print(f"     !! Failed to FILL. Error: {e}")
-                    
-                    elif action == "UPLOAD":
-                        path = USER_DATA.get("resume_path")
-                        try:
-                            await page.locator(selector).first.set_input_files(path, timeout=10000)
-                        except Exception as e:
-                            print(f"     !! Failed to UPLOAD. This is critical. Aborting job. Error: {e}")
-                            return {"status": "error", "message": f"Failed to upload resume to selector: {selector}"}
-
-                    elif action == "SELECT":
-                        value = step.get("value_to_select")
-                        try:
-                            await page.locator(selector).first.select_option(value)
-                        except Exception as e:
-                            print(f"     !! Failed to SELECT '{value}' for selector '{selector}'. Error: {e}")
-
-                    elif action == "CUSTOM_SELECT":
-                        option_text = step.get("option_text")
-                        try:
-                            # For combobox-style dropdowns, click to activate, type the value, then press Enter.
-                            await page.locator(selector).first.click()
-                            await asyncio.sleep(0.2) # Brief pause after click
-                            await page.locator(selector).first.fill(option_text)
-                            # Wait for the dropdown options to appear/filter
-                            await asyncio.sleep(0.5)
-                            # Press Enter to confirm the selection
-                            await page.locator(selector).first.press("Enter")
-                        except Exception as e:
-                            print(f"     !! Failed to perform CUSTOM_SELECT for '{option_text}' on selector '{selector}'. Error: {e}")
-
-                    elif action == "ANSWER_QUESTION":
-                        question_text = step.get("question_text")
-                        try:
-                            answer = await get_answer_from_gemini(question_text, job_description, USER_DATA["resume_text"])
-                            await page.locator(selector).first.fill(answer)
-                        except Exception as e:
-                            print(f"     !! Failed to ANSWER question '{question_text[:30]}...'. Error: {e}")
-
-                    elif action == "CLICK":
-                        try:
-                            # Use expect_navigation for clicks that should change the page
-                            async with page.expect_navigation(timeout=5000, wait_until='domcontentloaded'):
-                                await page.locator(selector).first.click()
-                            print(f"    -> Navigation detected to: {page.url}")
-                            navigated = True
-                            break  # Exit plan loop to re-analyze new page
-                        except PlaywrightTimeoutError:
-                            # This is okay, it means the click didn't navigate (e.g., a radio button)
-                            print("    -> Click did not cause navigation. Continuing plan.")
-                        except Exception as e:
-                            print(f"     !! Failed to CLICK. Aborting job. Error: {e}")
-                            return {"status": "error", "message": f"Failed to click selector: {selector}"}
+            context = await browser.new_context(storage_state=storage_state)
+        except Exception as e:
+            if storage_state is None:
+                raise
+            print(f"Agent (Autofill): Could not load saved storage state ({e}). Starting from a fresh context.")
+            context = await browser.new_context()
+        await context.route("**/*", _block_heavy_resources)
+        page = await context.new_page()
+        print(f"Agent (Autofill): Navigating to {job_url}...")
+        await page.goto(job_url, timeout=60000)
+
+        max_pages_to_process = 10  # Safety break for navigation loops
+        for i in range(max_pages_to_process):
+            print(f"\n--- Analyzing Page {i + 1}/{max_pages_to_process} at {page.url} ---")
+            await page.wait_for_load_state('domcontentloaded', timeout=15000)
+            await asyncio.sleep(2)  # Wait for dynamic content
+
+            # Parsed once: the same tree yields the job description, the plan cache key and the trimmed prompt HTML
+            doc = lxml.html.fromstring(await page.content())
+            etree.strip_elements(doc, *_NON_VISIBLE_TAGS, with_tail=False)
+
+            # Scrape job description for context-aware answers
+            job_description = _job_description_text(doc)
+            plan_cache_key = _plan_cache_key(doc)
+
+            page_plan_json = await get_page_plan_from_gemini(_trim_for_planning(doc), plan_cache_key)
+            page_plan = page_plan_json.get("plan", [])
+
+            if not page_plan:
+                print("  -> Gemini found no further actions for this page. Ending application attempt.")
+                break
+
+            # All of the page's questions are answered up front in one request, then consumed in plan order
+            questions = [step.get("question_text") or "" for step in page_plan if step.get("action") == "ANSWER_QUESTION"]
+            answers = iter(await get_answers_from_gemini(questions, job_description, USER_DATA["resume_text"]) if questions else [])
+
+            navigated = False
+            for step_num, step in enumerate(page_plan):
+                action = step.get("action", "FAIL")
+                selector = step.get("selector")
+                print(f"  [Step {step_num + 1}/{len(page_plan)}] Action: {action}, Selector: '{selector}'")
+
+                if action == "FILL":
+                    key = step.get("user_data_key")
+                    value = USER_DATA.get(key)
+                    try:
+                        await page.locator(selector).first.fill(str(value))
+                    except Exception as e:
+                        print(f"     !! Failed to FILL. Error: {e}")
                 
-                if not navigated:
-                    # If we finished the whole plan and didn't navigate, we are done.
-                    print("\n  -> Completed page plan without navigation. Assuming application is finished.")
-                    break
+                elif action == "UPLOAD":
+                    path = USER_DATA.get("resume_path")
+                    try:
+                        await page.locator(selector).first.set_input_files(path, timeout=10000)
+                    except Exception as e:
+                        print(f"     !! Failed to UPLOAD. This is critical. Aborting job. Error: {e}")
+                        _forget_plan(plan_cache_key)
+                        return {"status": "error", "message": f"Failed to upload resume to selector: {selector}"}
+
+                elif action == "SELECT":
+                    value = step.get("value_to_select")
+                    try:
+                        await page.locator(selector).first.select_option(value)
+                    except Exception as e:
+                        print(f"     !! Failed to SELECT '{value}' for selector '{selector}'. Error: {e}")
+
+                elif action == "CUSTOM_SELECT":
+                    option_text = step.get("option_text")
+                    try:
+                        # For combobox-style dropdowns, click to activate, type the value, then press Enter.
+                        await page.locator(selector).first.click()
+                        await asyncio.sleep(0.2) # Brief pause after click
+                        await page.locator(selector).first.fill(option_text)
+                        # Wait for the dropdown options to appear/filter
+                        await asyncio.sleep(0.5)
+                        # Press Enter to confirm the selection
+                        await page.locator(selector).first.press("Enter")
+                    except Exception as e:
+                        print(f"     !! Failed to perform CUSTOM_SELECT for '{option_text}' on selector '{selector}'. Error: {e}")
+
+                elif action == "ANSWER_QUESTION":
+                    question_text = step.get("question_text") or ""
+                    answer = next(answers)
+                    try:
+                        await page.locator(selector).first.fill(answer)
+                    except Exception as e:
+                        print(f"     !! Failed to ANSWER question '{question_text[:30]}...'. Error: {e}")
+
+                elif action == "CLICK":
+                    try:
+                        # Use expect_navigation for clicks that should change the page
+                        async with page.expect_navigation(timeout=5000, wait_until='domcontentloaded'):
+                            await page.locator(selector).first.click()
+                        print(f"    -> Navigation detected to: {page.url}")
+                        navigated = True
+                        break  # Exit plan loop to re-analyze new page
+                    except PlaywrightTimeoutError:
+                        # This is okay, it means the click didn't navigate (e.g., a radio button)
+                        print("    -> Click did not cause navigation. Continuing plan.")
+                    except Exception as e:
+                        print(f"     !! Failed to CLICK. Aborting job. Error: {e}")
+                        _forget_plan(plan_cache_key)
+                        return {"status": "error", "message": f"Failed to click selector: {selector}"}
             
-            print("\nForm filling process complete or max pages reached. Pausing for review.")
-            print("The browser will remain open. Please review the form, then manually close the browser to continue.")
-            await page.wait_for_timeout(60000)
-
-            await browser.close()
-            return {"status": "success", "message": "Autofill process complete. Browser was open for review."}
+            if not navigated:
+                # If we finished the whole plan and didn't navigate, we are done.
+                print("\n  -> Completed page plan without navigation. Assuming application is finished.")
+                break
 
+        try:
+            await _save_storage_state(context)
         except Exception as e:
-            print(f"An unexpected error occurred during the apply process: {e}")
-            if 'browser' in locals() and browser.is_connected():
-                await browser.close()
-            return {"status": "error", "message": str(e)}
+            print(f"Agent (Autofill): Could not save browser storage state. Error: {e}")
+        
+        if HEADLESS_MODE:
+            print("\nForm filling process complete or max pages reached.")
+            return {"status": "success", "message": "Autofill process complete."}
+
+        if holding_slot:
+            # Filling is done; waiting on the user shouldn't keep another job from starting
+            slot.release()
+            holding_slot = False
+
+        print("\nForm filling process complete or max pages reached. Pausing for review.")
+        print("The tab will remain open. Please review the form, then close the tab to continue.")
+        try:
+            await page.wait_for_event("close", timeout=REVIEW_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            print(f"Agent (Autofill): No review after {REVIEW_TIMEOUT_MS // 1000}s. Closing the tab.")
+
+        return {"status": "success", "message": "Autofill process complete. Browser was open for review."}
+
+    except Exception as e:
+        print(f"An unexpected error occurred during the apply process: {e}")
+        return {"status": "error", "message": str(e)}
+    finally:
+        if holding_slot:
+            slot.release()
+        # Only this job's context is closed; the browser is shared with the other applications
+        if context:
+            await context.close()
 
 
 root_agent = Agent(
@@ -434,7 +757,7 @@ root_agent = Agent(
         "2. Save the findings to Google Sheets."
         "3. Attempt to autofill applications for up to 5 of the discovered jobs."
         "   - The URL is fixed. Always use: https://github.com/vanshb03/Summer2026-Internships?tab=readme-ov-file"
-        "   - The tool will open a browser window for each application attempt. The user should monitor this."
+        "   - Applications run in a headless browser by default. With AGENT_HEADLESS=0 the tool opens a browser tab for each application attempt and waits for the user to review and close it."
         "After running, report on how many internships were found and how many application attempts were made."
     ),
     tools=[find_and_apply_for_internships],